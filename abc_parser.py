@@ -1,8 +1,26 @@
 """
 ABC file parsing functions
 """
-from typing import List, Dict  # importing lists and dicts for type hinting
-import re  # regular expression operations for splitting tunes
+from typing import List, Dict, Iterable, Iterator  # importing types for type hinting
+import re  # regular expression operations for reading tune headers
+import sys  # sys.intern for header values shared by many tunes
+
+# Compiled once at import so every tune reuses it
+_HDR_RE = re.compile(r'^[ \t]*([XTRMK]):[ \t]*([^\n]*)', re.MULTILINE)
+_FIELD_MAP = {
+    'X': 'reference_number',
+    'T': 'title',
+    'R': 'type',
+    'M': 'meter',
+    'K': 'key'
+}
+# Fields with a small set of values repeated across thousands of tunes ('reel', '4/4', 'D'),
+# interned so every tune shares one string object per distinct value
+_INTERNED_FIELDS = frozenset({'type', 'meter', 'key'})
+
+# Bump whenever a change here alters what parse_abc_file returns for the same
+# file; main.py's parse cache is keyed on it, so old pickles are ignored
+PARSER_VERSION = 1
 
 
 def parse_abc_file(file_path: str) -> List[Dict[str, str]]:
@@ -23,21 +41,17 @@ def parse_abc_file(file_path: str) -> List[Dict[str, str]]:
     tunes = []
 
     try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
-
-        # Split by X: to separate tunes (X: marks the start of each tune)
-        tune_sections = re.split(r'\n(?=X:)', content)
-
-        for section in tune_sections:
-            # Skip empty sections or sections without X:
-            if not section.strip() or not section.strip().startswith('X:'):
-                continue
-            
-            # Parse this tune and add it to the list
-            tune_dict = parse_single_tune(section)
-            if tune_dict:
-                tunes.append(tune_dict)
+        # 1 MiB read buffer, the file is streamed a tune at a time rather than read whole
+        with open(file_path, 'r', encoding='utf-8', errors='ignore', buffering=1 << 20) as f:
+            for section in _iter_sections(f):
+                # Skip empty sections or sections without X:
+                if not section.strip() or not section.strip().startswith('X:'):
+                    continue
+                
+                # Parse this tune and add it to the list
+                tune_dict = parse_single_tune(section)
+                if tune_dict:
+                    tunes.append(tune_dict)
 
     except Exception as e:
         print(f"Error parsing {file_path}: {e}")
@@ -45,6 +59,31 @@ def parse_abc_file(file_path: str) -> List[Dict[str, str]]:
     return tunes
 
 
+def _iter_sections(lines: Iterable[str]) -> Iterator[str]:
+    """
+    Group lines into tune sections, starting a new one at every X: line.
+
+    Args:
+        lines: Lines of an ABC file (an open file object works)
+
+    Returns:
+        Iterator of section texts; anything before the first X: comes out as its own section
+    """
+    buffer = []
+
+    for line in lines:
+        if line.startswith('X:') and buffer:
+            # the newline before X: separates tunes, it isn't part of the previous tune
+            buffer[-1] = buffer[-1][:-1]
+            yield ''.join(buffer)
+            buffer = [line]
+        else:
+            buffer.append(line)
+
+    if buffer:
+        yield ''.join(buffer)
+
+
 def parse_single_tune(tune_text: str) -> Dict[str, str]:
     """
     Parse a single tune's ABC notation.
@@ -64,30 +103,22 @@ def parse_single_tune(tune_text: str) -> Dict[str, str]:
         'abc_notation': tune_text
     }
     
-    lines = tune_text.split('\n')
-
-    for line in lines:
-        line = line.strip()
-
-        # Reference number (X:)
-        if line.startswith('X:'):
-            tune_dict['reference_number'] = line[2:].strip()
+    # One regex pass over the header instead of checking every line in Python
+    for match in _HDR_RE.finditer(tune_text):
+        field = _FIELD_MAP[match.group(1)]
 
-        # Title (T:) - take the first one if multiple 
-        elif line.startswith('T:') and not tune_dict['title']:
-            tune_dict['title'] = line[2:].strip()
+        # Title (T:) - take the first one if multiple
+        if field == 'title' and tune_dict['title']:
+            continue
 
-        # Type/Rhythm (R:)
-        elif line.startswith('R:'):
-            tune_dict['type'] = line[2:].strip()
+        value = match.group(2).strip()
+        if field in _INTERNED_FIELDS:
+            value = sys.intern(value)
+        tune_dict[field] = value
 
-        # Meter (M:)
-        elif line.startswith('M:'):
-            tune_dict['meter'] = line[2:].strip()
-        
-        # Key (K:)
-        elif line.startswith('K:'):
-            tune_dict['key'] = line[2:].strip()
+        # Key (K:) ends the header, the note body after it is never scanned
+        if field == 'key':
+            break
 
     return tune_dict
 
@@ -102,7 +133,7 @@ if __name__ == "__main__":
     print(f"File has {len(content)} characters")
     
     # Try the split
-    tune_sections = re.split(r'\n(?=X:)', content)
+    tune_sections = list(_iter_sections(content.splitlines(keepends=True)))
     print(f"Number of sections after split: {len(tune_sections)}")
     
     # Check first few sections
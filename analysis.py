@@ -2,36 +2,299 @@
 Data analysis functions using pandas 
 """
 
+import re
+import numpy as np
 import pandas as pd 
-from database import connect_to_database
-from typing import Optional
-
-
-def load_tunes_from_database() -> Optional[pd.DataFrame]:
+from database import connect_to_database, get_database_url
+from typing import Optional, List, Dict, Any
+
+# Casefolded copies of the text columns the filters search, so each search
+# only casefolds the search term rather than the whole column. type and
+# key_signature are categoricals and get matched on their categories instead
+SEARCH_COLUMNS = {
+    'title': '_title_lc'
+}
+
+# Every column a tunes DataFrame can have, and where it comes from in the
+# tunes/files join, in the column order of the original single tunes table
+TUNE_COLUMNS = {
+    'id': 't.id',
+    'book_number': 'f.book_number',
+    'reference_number': 't.reference_number',
+    'title': 't.title',
+    'type': 't.type',
+    'meter': 't.meter',
+    'key_signature': 't.key_signature',
+    'abc_notation': 't.abc_notation',
+    'file_path': 'f.file_path',
+    'created_at': 't.created_at'
+}
+
+# Columns loaded by default, leaving out the large notation text and the
+# file bookkeeping that the analysis functions never read
+DEFAULT_COLUMNS = ['id', 'book_number', 'reference_number', 'title', 'type', 'meter', 'key_signature']
+
+# Columns the UI tables and the pdf export show, enough for an interactive session
+DISPLAY_COLUMNS = ('id', 'book_number', 'title', 'type', 'key_signature', 'meter')
+
+# Low cardinality columns stored as pandas categoricals (small integer codes)
+CATEGORY_COLUMNS = ('type', 'key_signature', 'book_number')
+
+
+def _topk_counts_numpy(codes: np.ndarray, n_categories: int, k: int):
+    """Count each category code and return the k most common (codes, counts)"""
+    counts = np.bincount(codes[codes >= 0], minlength=n_categories)
+    order = np.argsort(-counts, kind='mergesort')[:k]
+    return order, counts[order]
+
+
+def _topk_counts_loop(codes, n_categories, k):
+    """Loop version of _topk_counts_numpy, one pass over the codes, for numba to compile"""
+    counts = np.zeros(n_categories, np.int64)
+    for code in codes:
+        if code >= 0:  # -1 is a missing value
+            counts[code] += 1
+    order = np.argsort(-counts, kind='mergesort')[:k]
+    return order, counts[order]
+
+
+# Counting kernel picked on first use; numba is slow to import so it is left
+# out of startup, and it is optional, numpy's bincount does the same job
+_topk_counts = None
+
+
+def _get_topk_counts():
+    """Return the numba compiled counting kernel, or the numpy version without numba"""
+    global _topk_counts
+    if _topk_counts is None:
+        try:
+            from numba import njit
+            _topk_counts = njit(cache=True)(_topk_counts_loop)
+        except ImportError:
+            _topk_counts = _topk_counts_numpy
+    return _topk_counts
+
+
+def _tunes_query(columns: List[str]) -> str:
+    """Build the SELECT for the given columns over the tunes/files join"""
+    select_list = ', '.join(f"{TUNE_COLUMNS[column]} AS {column}" for column in columns)
+    return f"SELECT {select_list} FROM tunes t JOIN files f ON f.file_id = t.file_id "
+
+
+def load_tunes_from_database(columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
     """
     Load all tunes from MySQL into a pandas DataFrame
 
+    Only DEFAULT_COLUMNS are fetched unless columns says otherwise, use
+    load_tunes_with_notation when the full ABC text is needed.
+
+    Args:
+        columns: Names from TUNE_COLUMNS to select, e.g. DISPLAY_COLUMNS
+
     Returns:
-        dataframe containing all tune data and none if theres an error 
+        dataframe containing the tune metadata and none if theres an error 
 
     Example:
         >>> df = load_tunes_from_database()
         >>> print(df.head())
+        >>> df = load_tunes_from_database(DISPLAY_COLUMNS)
     """
-    conn = connect_to_database()
+    if columns is None:
+        columns = DEFAULT_COLUMNS
 
-    if not conn:
-        print("Failed to connect to the database")
+    unknown = [column for column in columns if column not in TUNE_COLUMNS]
+    if unknown:
+        print(f"Unknown tune columns: {', '.join(unknown)}")
         return None
+
+    return _load_tunes(list(columns))
+
+
+def load_tunes_with_notation() -> Optional[pd.DataFrame]:
+    """
+    Load all tunes from MySQL with every column, including the ABC notation
+
+    Returns:
+        dataframe containing all tune data and none if theres an error 
+
+    Example:
+        >>> df = load_tunes_with_notation()
+        >>> print(df['abc_notation'].iloc[0])
+    """
+    return _load_tunes(list(TUNE_COLUMNS))
+
+
+def _load_tunes(columns: List[str]) -> Optional[pd.DataFrame]:
+    """
+    Load the given columns of every tune into a DataFrame
+
+    Uses connectorx when it is installed, which reads the result set straight into
+    columnar buffers, and falls back to pd.read_sql over the mysql connector otherwise.
+    """
+    query = _tunes_query(columns)
+    df = None
+
+    try:
+        import connectorx as cx
+        df = cx.read_sql(get_database_url(), query, return_type="pandas")
+    except ImportError:
+        pass  # connectorx is optional
+    except Exception as e:
+        print(f"connectorx load failed, falling back to the mysql connector: {e}")
+
+    if df is None:
+        conn = connect_to_database()
+
+        if not conn:
+            print("Failed to connect to the database")
+            return None
+        try:
+            df = pd.read_sql(query, conn)
+            conn.close()
+        except Exception as e:
+            print(f"Error loading data: {e}")
+            conn.close()
+            return None 
+
+    convert_to_categories(df)
+    add_search_columns(df)
+    return df
+
+
+def convert_to_categories(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Store the low cardinality columns as categoricals
+
+    value_counts, mode and equality filters then work on the integer codes
+    instead of Python objects, and each value takes 1-2 bytes per row.
+
+    Args:
+        df: DataFrame containing tune data (modified in place)
+
+    Returns:
+        The same DataFrame, for chaining
+    """
+    for column in CATEGORY_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype('category')
+    return df
+
+
+def add_search_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add casefolded copies of the searchable columns, computed once per load
+
+    casefold is the Unicode case-insensitive form (it also folds e.g. 'ß' to 'ss').
+
+    Args:
+        df: DataFrame containing tune data (modified in place)
+
+    Returns:
+        The same DataFrame, for chaining
+    """
+    for column, search_column in SEARCH_COLUMNS.items():
+        if column in df.columns:
+            df[search_column] = df[column].str.casefold()
+    return df
+
+
+def apply_tune_update(df: pd.DataFrame, tune_id: int, updates: Dict[str, str]) -> pd.DataFrame:
+    """
+    Make the same change update_tune made in the database to a loaded DataFrame
+
+    Lets a session keep using its DataFrame after an edit instead of reloading.
+    New values for a categorical column are added to its categories first.
+
+    Args:
+        df: DataFrame containing tune data (modified in place)
+        tune_id: ID of the tune that was updated
+        updates: The column -> new value dict passed to update_tune
+
+    Returns:
+        The same DataFrame, for chaining
+    """
+    rows = _equals_mask(df['id'], tune_id)
+
+    for column, value in updates.items():
+        if column not in df.columns:
+            continue
+
+        if isinstance(df[column].dtype, pd.CategoricalDtype) and value not in df[column].cat.categories:
+            df[column] = df[column].cat.add_categories([value])
+        df.loc[rows, column] = value
+
+        search_column = SEARCH_COLUMNS.get(column)
+        if search_column in df.columns:
+            df.loc[rows, search_column] = value.casefold()
+
+    return df
+
+
+def remove_tune(df: pd.DataFrame, tune_id: int) -> pd.DataFrame:
+    """
+    Drop a tune deleted with delete_tune from a loaded DataFrame
+
+    Args:
+        df: DataFrame containing tune data (modified in place)
+        tune_id: ID of the tune that was deleted
+
+    Returns:
+        The same DataFrame, for chaining
+    """
+    df.drop(index=df.index[_equals_mask(df['id'], tune_id)], inplace=True)
+    return df
+
+
+def _read_tunes_query(conn, query: str, params: tuple) -> Optional[pd.DataFrame]:
+    """Run a parameterised tunes query on an open connection into a DataFrame"""
     try:
-        query = "SELECT * FROM tunes"
-        df = pd.read_sql(query, conn)
-        conn.close()
-        return df
+        df = pd.read_sql(query, conn, params=params)
     except Exception as e:
         print(f"Error loading data: {e}")
-        conn.close()
-        return None 
+        return None
+    return add_search_columns(convert_to_categories(df))
+
+
+def _search_column(df: pd.DataFrame, column: str) -> pd.Series:
+    """Return the casefolded search column, computing it if the frame doesn't have it"""
+    search_column = SEARCH_COLUMNS[column]
+    if search_column in df.columns:
+        return df[search_column]
+    return df[column].str.casefold()
+
+
+def _contains_mask(series: pd.Series, term: str) -> np.ndarray:
+    """
+    Boolean mask of the rows containing term (case-insensitive)
+
+    For a categorical only the distinct categories are searched, then the
+    rows are picked out by their integer codes with a single isin.
+    """
+    term = term.casefold()
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        return series.str.casefold().str.contains(term, regex=False, na=False).to_numpy()
+
+    categories = series.cat.categories
+    matched = np.flatnonzero(categories.str.casefold().str.contains(term, regex=False))
+    return np.isin(series.cat.codes.to_numpy(), matched)
+
+
+def _equals_mask(series: pd.Series, value) -> np.ndarray:
+    """
+    Boolean mask of the rows equal to value
+
+    For a categorical the value is looked up once in the categories and the
+    comparison runs over the integer codes as a single numpy compare.
+    """
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        return (series == value).to_numpy()
+
+    categories = series.cat.categories
+    if value not in categories:
+        return np.zeros(len(series), dtype=bool)
+    return series.cat.codes.to_numpy() == categories.get_loc(value)
+
+
 def get_tunes_by_book(df: pd.DataFrame, book_number: int) -> pd.DataFrame:
     """
     Get all tunes from a specific book
@@ -48,7 +311,26 @@ def get_tunes_by_book(df: pd.DataFrame, book_number: int) -> pd.DataFrame:
         >>> book_1_tunes = get_tunes_by_book(df, 1)
     """
 
-    return df[df['book_number'] == book_number]
+    return df[_equals_mask(df['book_number'], book_number)]
+
+def get_tunes_by_book_sql(conn, book_number: int) -> Optional[pd.DataFrame]:
+    """
+    Get all tunes from a specific book, filtered by MySQL using the book index
+
+    Args:
+        conn: MySQL connection object
+        book_number: Book number to filter by
+
+    Returns:
+        DataFrame of matching tunes or None if theres an error
+
+    Example:
+        >>> conn = connect_to_database()
+        >>> book_1_tunes = get_tunes_by_book_sql(conn, 1)
+    """
+    query = _tunes_query(DEFAULT_COLUMNS) + "WHERE f.book_number = %s"
+    return _read_tunes_query(conn, query, (book_number,))
+
 
 def get_tunes_by_type(df: pd.DataFrame, tune_type: str) -> pd.DataFrame:
     """
@@ -65,8 +347,8 @@ def get_tunes_by_type(df: pd.DataFrame, tune_type: str) -> pd.DataFrame:
         >>> df = load_tunes_from_database()
         >>> jigs = get_tunes_by_type(df, 'jig')
     """
-    # Case-insensitive search
-    return df[df['type'].str.contains(tune_type, case=False, na=False)]
+    # Case-insensitive search, as a plain substring match on the distinct types
+    return df[_contains_mask(df['type'], tune_type)]
 
 
 def search_tunes(df: pd.DataFrame, search_term: str) -> pd.DataFrame:
@@ -84,7 +366,60 @@ def search_tunes(df: pd.DataFrame, search_term: str) -> pd.DataFrame:
         >>> df = load_tunes_from_database()
         >>> results = search_tunes(df, 'wind')
     """
-    return df[df['title'].str.contains(search_term, case=False, na=False)]
+    return df[_search_column(df, 'title').str.contains(search_term.casefold(), regex=False, na=False)]
+
+
+def search_tunes_sql(conn, search_term: str) -> Optional[pd.DataFrame]:
+    """
+    Search tune titles in MySQL using the FULLTEXT index
+
+    Natural language mode matches whole words rather than substrings, so
+    results can differ from search_tunes for very short or partial terms.
+
+    Args:
+        conn: MySQL connection object
+        search_term: Words to search for in titles
+
+    Returns:
+        DataFrame of matching tunes or None if theres an error
+
+    Example:
+        >>> conn = connect_to_database()
+        >>> results = search_tunes_sql(conn, 'wind')
+    """
+    query = _tunes_query(DEFAULT_COLUMNS) + "WHERE MATCH(t.title) AGAINST (%s IN NATURAL LANGUAGE MODE)"
+    return _read_tunes_query(conn, query, (search_term,))
+
+
+def search_tunes_multi(df: pd.DataFrame, keywords: List[str], chunk_size: int = 25) -> pd.DataFrame:
+    """
+    Search for tunes whose title contains any of several keywords (case-insensitive)
+
+    The keywords are matched in chunks of chunk_size, each chunk as its own
+    alternation pattern, and the masks are OR-ed together. This keeps every
+    pattern short instead of building one huge alternation that backtracks.
+
+    Args:
+        df: DataFrame containing tune data
+        keywords: Terms to search for in titles
+        chunk_size: Number of keywords per regex (default 25)
+
+    Returns:
+        Filtered DataFrame
+
+    Example:
+        >>> df = load_tunes_from_database()
+        >>> results = search_tunes_multi(df, ['wind', 'hill'])
+    """
+    titles = _search_column(df, 'title')
+    patterns = [re.escape(keyword.casefold()) for keyword in keywords if keyword]
+
+    mask = pd.Series(False, index=df.index)
+    for start in range(0, len(patterns), chunk_size):
+        pattern = '|'.join(patterns[start:start + chunk_size])
+        mask |= titles.str.contains(pattern, regex=True, na=False)
+
+    return df[mask]
 
 
 def get_tunes_by_key(df: pd.DataFrame, key_signature: str) -> pd.DataFrame:
@@ -102,7 +437,92 @@ def get_tunes_by_key(df: pd.DataFrame, key_signature: str) -> pd.DataFrame:
         >>> df = load_tunes_from_database()
         >>> d_major_tunes = get_tunes_by_key(df, 'D')
     """
-    return df[df['key_signature'].str.contains(key_signature, case=False, na=False)]
+    return df[_contains_mask(df['key_signature'], key_signature)]
+
+
+def build_group_index(df: pd.DataFrame, column: str) -> Dict[Any, np.ndarray]:
+    """
+    Map each distinct value of a column to the row positions holding it
+
+    Built once for a DataFrame that isn't going to change, so later lookups
+    are a dict lookup instead of comparing the whole column.
+
+    Args:
+        df: DataFrame containing tune data
+        column: Column to index (e.g., 'book_number', 'type')
+
+    Returns:
+        Dictionary of value -> array of row positions
+
+    Example:
+        >>> book_index = build_group_index(df, 'book_number')
+        >>> book_1_tunes = get_tunes_by_book_indexed(df, book_index, 1)
+    """
+    return df.groupby(column, observed=True, sort=False).indices
+
+
+def _take_positions(df: pd.DataFrame, positions: List[np.ndarray]) -> pd.DataFrame:
+    """Rows at the given positions, in their original order"""
+    if not positions:
+        return df.iloc[:0]
+    return df.take(np.sort(np.concatenate(positions)))
+
+
+def get_tunes_by_book_indexed(df: pd.DataFrame, index: Optional[Dict[Any, np.ndarray]], book_number: int) -> pd.DataFrame:
+    """
+    Same as get_tunes_by_book, using an index from build_group_index
+
+    Args:
+        df: DataFrame the index was built from
+        index: build_group_index(df, 'book_number'), or None to scan the column
+        book_number: Book number to filter by
+
+    Returns:
+        Filtered DataFrame
+    """
+    if index is None:
+        return get_tunes_by_book(df, book_number)
+    return _take_positions(df, [index[book_number]] if book_number in index else [])
+
+
+def _get_tunes_by_text_indexed(df: pd.DataFrame, index: Dict[Any, np.ndarray], term: str) -> pd.DataFrame:
+    """Rows whose indexed value contains term (case-insensitive), checking each distinct value once"""
+    term = term.casefold()
+    return _take_positions(df, [positions for value, positions in index.items() if term in str(value).casefold()])
+
+
+def get_tunes_by_type_indexed(df: pd.DataFrame, index: Optional[Dict[Any, np.ndarray]], tune_type: str) -> pd.DataFrame:
+    """
+    Same as get_tunes_by_type, using an index from build_group_index
+
+    Args:
+        df: DataFrame the index was built from
+        index: build_group_index(df, 'type'), or None to scan the column
+        tune_type: Type/rhythm to filter by (e.g., 'jig', 'reel', 'air')
+
+    Returns:
+        Filtered DataFrame
+    """
+    if index is None:
+        return get_tunes_by_type(df, tune_type)
+    return _get_tunes_by_text_indexed(df, index, tune_type)
+
+
+def get_tunes_by_key_indexed(df: pd.DataFrame, index: Optional[Dict[Any, np.ndarray]], key_signature: str) -> pd.DataFrame:
+    """
+    Same as get_tunes_by_key, using an index from build_group_index
+
+    Args:
+        df: DataFrame the index was built from
+        index: build_group_index(df, 'key_signature'), or None to scan the column
+        key_signature: Key signature to filter by (e.g., 'D', 'G', 'Am')
+
+    Returns:
+        Filtered DataFrame
+    """
+    if index is None:
+        return get_tunes_by_key(df, key_signature)
+    return _get_tunes_by_text_indexed(df, index, key_signature)
 
 
 def count_tunes_per_book(df: pd.DataFrame) -> pd.Series:
@@ -120,7 +540,31 @@ def count_tunes_per_book(df: pd.DataFrame) -> pd.Series:
         >>> counts = count_tunes_per_book(df)
         >>> print(counts)
     """
-    return df['book_number'].value_counts().sort_index()
+    counts = df['book_number'].value_counts().sort_index()
+    return counts[counts > 0]  # categoricals also count unused categories
+
+
+def _top_categories(series: pd.Series, n: int) -> pd.Series:
+    """
+    Most common values of a column with their counts, largest first
+
+    Categorical columns are counted straight from their integer codes,
+    anything else goes through value_counts.
+    """
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        counts = series.value_counts()
+        return counts[counts > 0].head(n)
+
+    categories = series.cat.categories
+
+    # there are never more than len(categories) to return, which also keeps k
+    # small enough for the compiled kernel; a negative n is applied afterwards
+    # by head(), like value_counts().head(n), once the unused categories are gone
+    k = len(categories) if n < 0 else min(n, len(categories))
+    order, counts = _get_topk_counts()(series.cat.codes.to_numpy(), len(categories), k)
+    keep = counts > 0  # categoricals also count unused categories
+    top = pd.Series(counts[keep], index=pd.Index(categories[order[keep]], name=series.name), name='count')
+    return top.head(n)
 
 
 def get_most_common_types(df: pd.DataFrame, n: int = 10) -> pd.Series:
@@ -138,7 +582,7 @@ def get_most_common_types(df: pd.DataFrame, n: int = 10) -> pd.Series:
         >>> df = load_tunes_from_database()
         >>> top_types = get_most_common_types(df, 5)
     """
-    return df['type'].value_counts().head(n)
+    return _top_categories(df['type'], n)
 
 
 def get_most_common_keys(df: pd.DataFrame, n: int = 10) -> pd.Series:
@@ -156,7 +600,26 @@ def get_most_common_keys(df: pd.DataFrame, n: int = 10) -> pd.Series:
         >>> df = load_tunes_from_database()
         >>> top_keys = get_most_common_keys(df, 5)
     """
-    return df['key_signature'].value_counts().head(n)
+    return _top_categories(df['key_signature'], n)
+
+def _count_distinct_and_mode(series: pd.Series) -> tuple:
+    """
+    Number of distinct values in a column and its most common value ('N/A' if empty)
+
+    Categorical columns are counted with a single bincount over their codes,
+    ties go to the first category like pandas mode does.
+    """
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        mode = series.mode()
+        return series.nunique(), mode[0] if not mode.empty else 'N/A'
+
+    codes = series.cat.codes.to_numpy()
+    counts = np.bincount(codes[codes >= 0], minlength=len(series.cat.categories))
+    distinct = int(np.count_nonzero(counts))
+    if distinct == 0:
+        return 0, 'N/A'
+    return distinct, series.cat.categories[counts.argmax()]
+
 
 def get_summary_statistics(df: pd.DataFrame) -> dict:
     """
@@ -174,23 +637,92 @@ def get_summary_statistics(df: pd.DataFrame) -> dict:
 
     """
 
+    # one count per column gives both the number of distinct values and the mode
+    total_types, most_common_type = _count_distinct_and_mode(df['type'])
+    total_keys, most_common_key = _count_distinct_and_mode(df['key_signature'])
+
     stats = {
         'total_tunes': len(df),
-        'total_books': df['book_number'].nunique(),
-        'total_types': df['type'].nunique(),
-        'total_keys': df['key_signature'].nunique(),
-        'most_common_type': df['type'].mode()[0] if not df['type'].mode().empty else 'N/A',
-        'most_common_key': df['key_signature'].mode()[0] if not df['key_signature'].mode().empty else 'N/A'
+        'total_books': _count_distinct_and_mode(df['book_number'])[0],
+        'total_types': total_types,
+        'total_keys': total_keys,
+        'most_common_type': most_common_type,
+        'most_common_key': most_common_key
     }
     return stats
 
-def export_to_pdf(df: pd.DataFrame, filename: str = "tunes_export.pdf") -> bool:
+# reportlab stylesheet, built on the first export and reused after that
+_pdf_styles = None
+
+
+def _get_pdf_styles():
+    """Return the shared reportlab sample stylesheet"""
+    global _pdf_styles
+    if _pdf_styles is None:
+        from reportlab.lib.styles import getSampleStyleSheet
+        _pdf_styles = getSampleStyleSheet()
+    return _pdf_styles
+
+
+def _pdf_column_widths(df: pd.DataFrame, columns: list, available: float) -> tuple:
+    """
+    Work out one set of column widths for every table chunk in the export
+
+    Each chunk is its own table, so widths are measured once up front from the
+    longest value in each column rather than letting every chunk size itself.
+    When that is wider than the page, columns narrower than an even share of
+    the page keep their width and the wider ones split what's left in
+    proportion, so the table always fits inside the frame.
+
+    Returns:
+        (widths, natural widths), a column narrower than its natural width
+        needs its long cells wrapped
+    """
+    from reportlab.pdfbase.pdfmetrics import stringWidth
+
+    natural = []
+    for col in columns:
+        width = stringWidth(col, 'Helvetica-Bold', 10)
+        if len(df):
+            values = df[col].astype(str)
+            longest = values.iat[values.str.len().to_numpy().argmax()]
+            width = max(width, stringWidth(longest, 'Helvetica', 10))
+        natural.append(width + 12) # default cell padding is 6 each side
+
+    widths = list(natural)
+    if sum(natural) > available:
+        flexible = list(range(len(columns)))
+        remaining = available
+        while True:
+            share = remaining / len(flexible)
+            fits = [i for i in flexible if natural[i] <= share]
+            if not fits:
+                break
+            flexible = [i for i in flexible if i not in fits]
+            remaining -= sum(natural[i] for i in fits)
+
+        flexible_total = sum(natural[i] for i in flexible)
+        for i in flexible:
+            widths[i] = remaining * natural[i] / flexible_total
+
+    return widths, natural
+
+
+def export_to_pdf(df: pd.DataFrame, filename: str = "tunes_export.pdf",
+                  max_rows: Optional[int] = 100, chunk_size: int = 200) -> bool:
     """
     Exporting dataframe to a pdf file
 
+    Rows go into the pdf as a run of tables of chunk_size rows each, so
+    reportlab never has to lay out and split one huge table. This only
+    splits up the layout work, every table is still built before the
+    document is, so memory grows with the number of rows exported.
+
     Args:
     df: DataFrame to export
     filename: Output PDF file
+    max_rows: Only export this many rows, None for all of them
+    chunk_size: Rows per table
 
     Returns:
     true if successful fasle if not
@@ -199,8 +731,7 @@ def export_to_pdf(df: pd.DataFrame, filename: str = "tunes_export.pdf") -> bool:
     try:
         from reportlab.lib import colors
         from reportlab.lib.pagesizes import letter, A4
-        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-        from reportlab.lib.styles import getSampleStyleSheet
+        from reportlab.platypus import SimpleDocTemplate, LongTable, TableStyle, Paragraph, Spacer
         from reportlab.lib.units import inch
 
         # CReate PDF
@@ -208,7 +739,7 @@ def export_to_pdf(df: pd.DataFrame, filename: str = "tunes_export.pdf") -> bool:
         elements = []
 
         # Add title
-        styles = getSampleStyleSheet()
+        styles = _get_pdf_styles()
         title = Paragraph("<b>ABC Tune Database Export</b>", styles['Title'])
         elements.append(title)
         elements.append(Spacer(1, 0.2 * inch))
@@ -219,15 +750,28 @@ def export_to_pdf(df: pd.DataFrame, filename: str = "tunes_export.pdf") -> bool:
         elements.append(Spacer(1, 0.2 * inch))
 
         # Select columns to display
-        display_columns = ['id', 'book_number', 'title', 'type', 'key_signature', 'meter']
-        df_display = df[display_columns].head(100) # limiting to first 100 for pdf
-
-        # converting lists to lists for table
-        data = [display_columns] + df_display.values.tolist()
-
-        # Create table
-        table = Table(data)
-        table.setStyle(TableStyle([
+        display_columns = list(DISPLAY_COLUMNS)
+        df_display = df[display_columns]
+        if max_rows is not None:
+            df_display = df_display.head(max_rows) # limiting to first 100 for pdf by default
+
+        col_widths, natural_widths = _pdf_column_widths(df_display, display_columns, pdf.width)
+
+        # values too wide for a narrowed column go in as Paragraphs, which wrap
+        # inside the cell; measured once here, the chunks below just look it up
+        from reportlab.pdfbase.pdfmetrics import stringWidth
+        from reportlab.lib.styles import ParagraphStyle
+        from xml.sax.saxutils import escape
+
+        cell_style = ParagraphStyle('cell', fontName='Helvetica', fontSize=10, leading=12)
+        wrap_columns = {}
+        for i, col in enumerate(display_columns):
+            if col_widths[i] < natural_widths[i]:
+                limit = col_widths[i] - 12
+                values = df_display[col].astype(str)
+                wrap_columns[i] = np.fromiter((stringWidth(value, 'Helvetica', 10) > limit for value in values),
+                                              dtype=bool, count=len(values))
+        table_style = TableStyle([
             ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
             ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
             ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
@@ -236,9 +780,33 @@ def export_to_pdf(df: pd.DataFrame, filename: str = "tunes_export.pdf") -> bool:
             ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
             ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
             ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        
-        elements.append(table)
+        ])
+
+        # One table per chunk, each with its own header row, so a big export
+        # is laid out a chunk at a time. LongTable still handles a chunk that
+        # runs over a page and repeats the header there
+        for start in range(0, max(len(df_display), 1), chunk_size):
+            chunk = df_display.iloc[start:start + chunk_size]
+
+            # header row then one plain tuple per tune, no intermediate array copy
+            data = [display_columns]
+            data.extend(chunk.itertuples(index=False, name=None))
+
+            if wrap_columns:
+                for row_number in range(1, len(data)):
+                    row = data[row_number]
+                    wrapped = None
+                    for i, wrap in wrap_columns.items():
+                        if wrap[start + row_number - 1]:
+                            if wrapped is None:
+                                wrapped = list(row)
+                            wrapped[i] = Paragraph(escape(str(row[i])), cell_style)
+                    if wrapped is not None:
+                        data[row_number] = wrapped
+
+            table = LongTable(data, colWidths=col_widths, repeatRows=1)
+            table.setStyle(table_style)
+            elements.append(table)
         
         # Build PDF
         pdf.build(elements)
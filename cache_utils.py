@@ -0,0 +1,26 @@
+"""
+Helpers for the on-disk pickle caches (main.py's parse cache and the UI session cache)
+"""
+from typing import Any
+import os
+import pickle
+
+def write_pickle_atomic(path: str, obj: Any):
+    """
+    Pickle obj to path, used for the parse cache and the UI session cache
+
+    Writes a temp file then renames it over path, so a killed run never
+    leaves half a pickle behind.
+
+    Raises:
+            OSError if the file can't be written
+    """
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, 'wb') as f:
+            pickle.dump(obj, f, protocol=5)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
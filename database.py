@@ -2,9 +2,66 @@
 Database operations for ABC tunes
 """
 
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Iterable
+from urllib.parse import quote
+import os
+import tempfile
+import threading
 import mysql.connector
-from mysql.connector import Error 
+from mysql.connector import Error, HAVE_CEXT, pooling
+
+# Connection settings, shared by the mysql connector and the connectorx loader in analysis.py
+DB_CONFIG = {
+    'host': 'localhost',
+    'user': 'root',
+    'password': 'root',
+    'database': 'abc_tunes_db'
+}
+
+# Driver options used by every connection, pooled or not
+CONNECT_OPTIONS = {
+    'use_pure': not HAVE_CEXT,      # libmysqlclient C extension when installed, pure Python otherwise
+    'autocommit': False,            # callers decide when to commit
+    'allow_local_infile': True      # needed for bulk_load_tunes
+}
+
+# Connections kept open for threads inserting in parallel
+POOL_SIZE = 8
+_pool = None
+_pool_lock = threading.Lock()
+
+# Secondary indexes on tunes: B-tree for the filter columns, FULLTEXT for title search
+# (book_number lives in the files table and is indexed there)
+TUNE_INDEXES = {
+    'idx_type': "CREATE INDEX idx_type ON tunes (type)",
+    'idx_key': "CREATE INDEX idx_key ON tunes (key_signature)",
+    'ft_title': "CREATE FULLTEXT INDEX ft_title ON tunes (title)"
+}
+
+# Insert for one tune row, used by both single and batch inserts
+INSERT_TUNE_QUERY = """
+INSERT INTO tunes (file_id, reference_number, title, type, meter, key_signature, abc_notation)
+VALUES (%s, %s, %s, %s, %s, %s, %s)
+"""
+
+# Registers a source file, or finds it if it is already there; either way
+# LAST_INSERT_ID() (cursor.lastrowid) ends up as the file's id
+INSERT_FILE_QUERY = """
+INSERT INTO files (book_number, file_path) VALUES (%s, %s)
+ON DUPLICATE KEY UPDATE file_id = LAST_INSERT_ID(file_id)
+"""
+
+# Bulk load of a tab separated file written by bulk_load_tunes, columns in INSERT_TUNE_QUERY order
+LOAD_TUNES_QUERY = """
+LOAD DATA LOCAL INFILE %s INTO TABLE tunes
+CHARACTER SET utf8mb4
+FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\'
+LINES TERMINATED BY '\\n'
+(file_id, reference_number, title, type, meter, key_signature, abc_notation)
+"""
+
+# Characters LOAD DATA would otherwise read as field/line separators or escapes
+_TSV_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
 
 
 def connect_to_database() -> Optional[mysql.connector.connection.MySQLConnection]:
@@ -16,20 +73,80 @@ def connect_to_database() -> Optional[mysql.connector.connection.MySQLConnection
     """
 
     try:
-        conn = mysql.connector.connect(
-            host = 'localhost',
-            user = 'root',
-            password = 'root',
-            database = 'abc_tunes_db'
-        )
+        conn = mysql.connector.connect(**DB_CONFIG, **CONNECT_OPTIONS)
         return conn
     except Error as e:
         print(f"Error connecting to database: {e}")
         return None
 
+def ensure_connected(conn: mysql.connector.connection.MySQLConnection) -> bool:
+    """
+    Check a long-lived connection is still open, reconnecting if the server dropped it
+
+    The server closes idle connections after wait_timeout, so a connection kept
+    for a whole UI session is checked before each use.
+
+    Returns:
+            True if the connection is usable, False if it couldn't be reopened
+    """
+
+    try:
+        conn.ping(reconnect=True, attempts=2, delay=1)
+        return True
+    except Error as e:
+        print(f"Lost the database connection: {e}")
+        return False
+
+def _rollback_quietly(conn: mysql.connector.connection.MySQLConnection):
+    """Roll back after a failed statement, ignoring a connection that's already gone"""
+    try:
+        conn.rollback()
+    except Error:
+        pass
+
+def get_pooled_connection() -> Optional[pooling.PooledMySQLConnection]:
+    """
+    Take a connection from the shared pool, creating the pool on first use.
+
+    Safe to call from several threads at once. Calling close() on the
+    connection hands it back to the pool. At most POOL_SIZE can be out at once.
+
+    Returns:
+            Pooled MySQL connection or None if connection fails
+    """
+    global _pool
+
+    try:
+        with _pool_lock:
+            if _pool is None:
+                _pool = pooling.MySQLConnectionPool(
+                    pool_name = 'abc_tunes',
+                    pool_size = POOL_SIZE,
+                    **DB_CONFIG,
+                    **CONNECT_OPTIONS
+                )
+            return _pool.get_connection()
+    except Error as e:
+        print(f"Error getting pooled connection: {e}")
+        return None
+
+def get_database_url() -> str:
+    """
+    Build a mysql:// URL from DB_CONFIG for libraries that connect by URL.
+
+    Returns:
+            Connection URL string
+    """
+    user = quote(DB_CONFIG['user'], safe='')
+    password = quote(DB_CONFIG['password'], safe='')
+    return f"mysql://{user}:{password}@{DB_CONFIG['host']}/{DB_CONFIG['database']}"
+
 def create_database_schema(conn: mysql.connector.connection.MySQLConnection) -> bool:
     """
-    Create the tunes table if it doesnt exist
+    Create the files and tunes tables and their indexes if they dont exist
+
+    Each source file is stored once in files, tunes point at it by file_id
+    instead of repeating the book number and path on every row.
 
     Args:
         conn: MySQL connection object
@@ -39,24 +156,52 @@ def create_database_schema(conn: mysql.connector.connection.MySQLConnection) ->
     """
     try:
         cursor = conn.cursor()
+
+        # Create files table
+        create_files_query = """
+        CREATE TABLE IF NOT EXISTS files (
+        file_id INT AUTO_INCREMENT PRIMARY KEY,
+        book_number INT NOT NULL,
+        file_path VARCHAR(500) NOT NULL,
+        UNIQUE KEY uq_file_path (file_path),
+        INDEX idx_book (book_number)
+        )
+        """
+
+        cursor.execute(create_files_query)
     
         # Create tunes table
         create_table_query = """
         CREATE TABLE IF NOT EXISTS tunes ( 
         id INT AUTO_INCREMENT PRIMARY KEY,
-        book_number INT NOT NULL,
+        file_id INT NOT NULL,
         reference_number VARCHAR(50),
         title VARCHAR(255),
         type VARCHAR(100),
         meter VARCHAR(50),
         key_signature VARCHAR(50),
         abc_notation TEXT,
-        file_path VARCHAR(500),
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (file_id) REFERENCES files (file_id)
         )
         """
 
         cursor.execute(create_table_query)
+
+        # A tunes table from before the files table can't be altered in place
+        cursor.execute("SHOW COLUMNS FROM tunes LIKE 'file_id'")
+        if not cursor.fetchall():
+            print("The tunes table uses the old schema without file_id. Run DROP TABLE tunes and load again")
+            cursor.close()
+            return False
+
+        # MySQL has no CREATE INDEX IF NOT EXISTS, so only add the missing ones
+        cursor.execute("SHOW INDEX FROM tunes")
+        existing_indexes = {row[2] for row in cursor.fetchall()}
+        for index_name, create_index_query in TUNE_INDEXES.items():
+            if index_name not in existing_indexes:
+                cursor.execute(create_index_query)
+
         conn.commit()
         cursor.close()
 
@@ -67,43 +212,74 @@ def create_database_schema(conn: mysql.connector.connection.MySQLConnection) ->
         print(f"Error creating schema: {e}")
         return False
 
-def insert_tune(conn: mysql.connector.connection.MySQLConnection, tune: Dict[str, str], book_number: int, file_path: str) -> bool:
+def get_file_id(conn: mysql.connector.connection.MySQLConnection, book_number: int, file_path: str) -> Optional[int]:
     """
-    Insert a single tune into the database
+    Get the files table id for a source file, adding the file if it is new
 
-    Args: 
-        conn: MySQL connection object 
-        tune: Dictionary containing tune metadata
+    Does not commit, the file row is committed with the caller's tunes.
+
+    Args:
+        conn: MySQL connection object
         book_number: Book/folder number
-        file_path: Path to the source ABC file 
+        file_path: Path to the source ABC file
 
     Returns:
-        True if successful, False otherwise
+        The file's id, or None if theres an error
     """
-
     try:
-        cursor = conn.cursor()
+        with conn.cursor() as cursor:
+            cursor.execute(INSERT_FILE_QUERY, (book_number, file_path))
+            return cursor.lastrowid
 
-        insert_query = """
-        INSERT INTO tunes (book_number, reference_number, title, type, meter, key_signature, abc_notation, file_path)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-        """
+    except Error as e:
+        print(f"Error registering file {file_path}: {e}")
+        return None
 
-        values = (
-            book_number,
-            tune.get('reference_number', ''),
-            tune.get('title', ''),
-            tune.get('type', ''),
-            tune.get('meter', ''),
-            tune.get('key', ''),
-            tune.get('abc_notation', ''),
-            file_path
-        )
+def tune_values(tune: Dict[str, str], file_id: int) -> tuple:
+    """
+    Build the INSERT_TUNE_QUERY parameters for one tune
 
-        cursor.execute(insert_query, values)
-        conn.commit()
-        cursor.close()
+    Args:
+        tune: Dictionary containing tune metadata
+        file_id: Id of the tune's source file, from get_file_id
 
+    Returns:
+        Tuple of column values in INSERT_TUNE_QUERY order
+    """
+    return (
+        file_id,
+        tune.get('reference_number', ''),
+        tune.get('title', ''),
+        tune.get('type', ''),
+        tune.get('meter', ''),
+        tune.get('key', ''),
+        tune.get('abc_notation', '')
+    )
+
+def insert_tune(cursor, tune: Dict[str, str], file_id: int) -> bool:
+    """
+    Insert a single tune using an open cursor.
+
+    Does not commit, the caller owns the transaction and commits once
+    after its batch of inserts.
+
+    Args: 
+        cursor: Cursor from an open MySQL connection
+        tune: Dictionary containing tune metadata
+        file_id: Id of the tune's source file, from get_file_id
+
+    Returns:
+        True if successful, False otherwise
+
+    Example:
+        >>> file_id = get_file_id(conn, 1, 'abc_books/1/hnair0.abc')
+        >>> with conn.cursor() as cursor:
+        ...     insert_tune(cursor, tune, file_id)
+        >>> conn.commit()
+    """
+
+    try:
+        cursor.execute(INSERT_TUNE_QUERY, tune_values(tune, file_id))
         return True
     
     except Error as e:
@@ -117,17 +293,87 @@ def insert_tunes_batch(conn: mysql.connector.connection.MySQLConnection, tunes:
     Args: 
         conn: MySQL connection object
         tunes: List of tiune dictionaries
-        file_path: path to tunes successfully inserted 
+        book_number: Book/folder number
+        file_path: path to the source ABC file 
 
     Retruns:
         Number of tunes successfully inserted
     """
 
-    count = 0 
-    for tune in tunes:
-        if insert_tune(conn, tune, book_number, file_path):
-            count+= 1
-    return count
+    if not tunes:
+        return 0
+
+    try:
+        file_id = get_file_id(conn, book_number, file_path)
+        if file_id is None:
+            conn.rollback()
+            return 0
+
+        values = [tune_values(tune, file_id) for tune in tunes]
+
+        # executemany rewrites this into one multi-row INSERT, committed once for the whole file
+        with conn.cursor() as cursor:
+            cursor.executemany(INSERT_TUNE_QUERY, values)
+            count = cursor.rowcount
+        conn.commit()
+
+        return count
+
+    except Error as e:
+        print(f"Error inserting tunes from {file_path}: {e}")
+        conn.rollback()
+        return 0
+
+def bulk_load_tunes(conn: mysql.connector.connection.MySQLConnection, rows: Iterable[tuple]) -> Optional[int]:
+    """
+    Load many tunes at once with LOAD DATA LOCAL INFILE
+
+    The rows are written to a temporary tab separated file that MySQL reads
+    straight into the table, skipping per-row statement parsing. The server
+    must have local_infile enabled.
+
+    Args:
+        conn: MySQL connection object
+        rows: Tuples from tune_values, in INSERT_TUNE_QUERY column order
+
+    Returns:
+        Number of tunes loaded, or None if the bulk load failed or gave any
+        warnings (nothing is loaded)
+    """
+    tsv_file = tempfile.NamedTemporaryFile('w', suffix='.tsv', encoding='utf-8', newline='\n', delete=False)
+
+    try:
+        with tsv_file:
+            for row in rows:
+                tsv_file.write('\t'.join(str(value).translate(_TSV_ESCAPES) for value in row))
+                tsv_file.write('\n')
+
+        with conn.cursor() as cursor:
+            cursor.execute(LOAD_TUNES_QUERY, (tsv_file.name,))
+            count = cursor.rowcount
+
+            # LOAD DATA LOCAL turns data errors (an over-long title, a bad number)
+            # into warnings and loads the truncated row anyway, which the normal
+            # inserts would refuse, so any warning fails the whole load
+            warning_count = cursor.warning_count
+            if warning_count:
+                cursor.execute("SHOW WARNINGS LIMIT 5")
+                for level, code, message in cursor.fetchall():
+                    print(f"  {level} {code}: {message}")
+                print(f"Bulk load gave {warning_count} warnings, not keeping it")
+                conn.rollback()
+                return None
+        conn.commit()
+
+        return count
+
+    except Error as e:
+        print(f"Error bulk loading tunes: {e}")
+        conn.rollback()
+        return None
+
+    finally:
+        os.remove(tsv_file.name)
 
 # Update tune feature
 def update_tune(conn: mysql.connector.connection.MySQLConnection,
@@ -167,6 +413,7 @@ def update_tune(conn: mysql.connector.connection.MySQLConnection,
             return False
     except Error as e:
         print(f"Error updating tune: {e}")
+        _rollback_quietly(conn)
         return False
 
 # Delete tune feature    
@@ -200,6 +447,7 @@ def delete_tune(conn: mysql.connector.connection.MySQLConnection,
         
     except Error as e:
         print(f"Error deleting tune: {e}")
+        _rollback_quietly(conn)
         return False
     
 def get_tune_by_id(conn: mysql.connector.connection.MySQLConnection,
@@ -218,16 +466,71 @@ def get_tune_by_id(conn: mysql.connector.connection.MySQLConnection,
     try:
         cursor = conn.cursor(dictionary=True)
 
-        query = "SELECT * FROM tunes WHERE id = %s"
+        query = """
+        SELECT t.*, f.book_number, f.file_path
+        FROM tunes t JOIN files f ON f.file_id = t.file_id
+        WHERE t.id = %s
+        """
         cursor.execute(query, (tune_id,))
 
         result = cursor.fetchone()
         cursor.close()
 
+        # end the read, otherwise the transaction it opened stays open on a
+        # long-lived connection, holding a stale snapshot and a lock on tunes
+        conn.commit()
+
         return result
     
     except Error as e:
         print(f"Error retrieving tune: {e}")
+        _rollback_quietly(conn)
+        return None
+
+
+def get_tunes_fingerprint(conn: mysql.connector.connection.MySQLConnection) -> Optional[tuple]:
+    """
+    Cheap summary of the tunes and files tables that changes whenever their data does
+
+    Row counts and highest ids catch inserts and deletes, the tables' UPDATE_TIME
+    catches edits. Used to tell whether a cached copy of the tunes is still current.
+
+    Args:
+    conn: MySQL connection object
+
+    returns:
+    tuple of the values above or none if theres an error
+    """
+
+    try:
+        cursor = conn.cursor()
+
+        # information_schema caches UPDATE_TIME for a day by default, read it fresh
+        try:
+            cursor.execute("SET SESSION information_schema_stats_expiry = 0")
+        except Error:
+            pass  # the setting only exists on MySQL 8+
+
+        cursor.execute("SELECT COUNT(*), MAX(id) FROM tunes")
+        tunes = cursor.fetchone()
+        cursor.execute("SELECT COUNT(*), MAX(file_id) FROM files")
+        files = cursor.fetchone()
+        cursor.execute("""
+        SELECT TABLE_NAME, UPDATE_TIME FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME IN ('tunes', 'files')
+        ORDER BY TABLE_NAME
+        """)
+        update_times = tuple(cursor.fetchall())
+        cursor.close()
+
+        # end the read so later statements on this connection see new data
+        conn.commit()
+
+        return tunes + files + update_times
+
+    except Error as e:
+        print(f"Error reading table status: {e}")
+        _rollback_quietly(conn)
         return None
 
 
@@ -255,7 +558,11 @@ if __name__ == '__main__':
         }
 
         print("\nTesting tune insertion...")
-        if insert_tune(conn, sample_tune, 0, 'test_abc'):
+        file_id = get_file_id(conn, 0, 'test_abc')
+        with conn.cursor() as cursor:
+            inserted = insert_tune(cursor, sample_tune, file_id)
+        conn.commit()
+        if inserted:
             print("Test tune inserted successfully!")
 
         # Check if it was inserted 
@@ -21,19 +21,21 @@ def find_abc_files(root_dir: str) -> List[Tuple[int, str]]:
     """
     abc_files = []
 
-    # Directory structure 
-    for folder_name in os.listdir(root_dir):
-        folder_path = os.path.join(root_dir, folder_name)
-
-        # Check if it's a directory and the name is a number 
-        if os.path.isdir(folder_path) and folder_name.isdigit():
-            book_number = int(folder_name)
-
-            # find all .abc files in this folder 
-            for file_name in os.listdir(folder_path):
-                if file_name.endswith('.abc'):
-                    file_path = os.path.join(folder_path, file_name)
-                    abc_files.append((book_number, file_path))
+    # Directory structure - scandir entries carry their file type, so no extra stat per entry
+    with os.scandir(root_dir) as folders:
+        for folder in folders:
+
+            # Check if it's a directory and the name is a number 
+            if folder.is_dir(follow_symlinks=False) and folder.name.isdigit():
+                book_number = int(folder.name)
+
+                # find all .abc files in this folder 
+                with os.scandir(folder.path) as entries:
+                    abc_files.extend(
+                        (book_number, entry.path)
+                        for entry in entries
+                        if entry.name.endswith('.abc') and entry.is_file(follow_symlinks=False)
+                    )
 
     return abc_files
 
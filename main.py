@@ -2,9 +2,87 @@
 Main entry point for ABC Tune Database application
 """
 
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import List, Dict
+import glob
+import hashlib
+import os
+import pickle
 from file_loader import find_abc_files
-from abc_parser import parse_abc_file
-from database import connect_to_database, create_database_schema, insert_tunes_batch
+from cache_utils import write_pickle_atomic
+from abc_parser import parse_abc_file, PARSER_VERSION
+from database import (
+    connect_to_database,
+    create_database_schema,
+    insert_tunes_batch,
+    bulk_load_tunes,
+    get_file_id,
+    get_pooled_connection,
+    tune_values,
+    POOL_SIZE
+)
+
+# Parsed tunes are cached here per file, keyed on the parser version and the file's path, mtime and size
+CACHE_DIR = '.abc_cache'
+
+
+def parse_abc_file_cached(file_path: str) -> List[Dict[str, str]]:
+    """
+    Parse an ABC file, reusing the pickled result from an earlier run if the file hasn't changed
+
+    Args:
+        file_path: Path to the ABC file
+
+    Returns:
+        List of tune dictionaries, the same as parse_abc_file
+    """
+    stat = os.stat(file_path)
+    path_hash = hashlib.blake2b(file_path.encode(), digest_size=8).hexdigest()
+    cache_path = os.path.join(CACHE_DIR, f"{path_hash}_v{PARSER_VERSION}_{stat.st_mtime_ns}_{stat.st_size}.pkl")
+
+    try:
+        with open(cache_path, 'rb') as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        pass  # not cached yet (or unreadable), parse it
+
+    tunes = parse_abc_file(file_path)
+
+    if tunes:
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+
+            # drop entries for older versions of this file
+            for old_cache_path in glob.glob(os.path.join(CACHE_DIR, f"{path_hash}_*.pkl")):
+                os.remove(old_cache_path)
+
+            write_pickle_atomic(cache_path, tunes)
+        except OSError as e:
+            print(f"Could not cache {file_path}: {e}")
+
+    return tunes
+
+
+def insert_tunes_pooled(tunes: List[Dict[str, str]], book_number: int, file_path: str) -> int:
+    """
+    Insert one file's tunes on a connection from the pool, for use from worker threads
+
+    Args:
+        tunes: List of tune dictionaries
+        book_number: Book/folder number
+        file_path: Path to the source ABC file
+
+    Returns:
+        Number of tunes inserted
+    """
+    conn = get_pooled_connection()
+    if not conn:
+        return 0
+
+    try:
+        return insert_tunes_batch(conn, tunes, book_number, file_path)
+    finally:
+        conn.close()  # back to the pool
 
 
 def load_all_tunes():
@@ -13,8 +91,11 @@ def load_all_tunes():
 
     This function:
     - Finds all abc files in the abc_books directory
-    - Parses each file to extract tune metadata
-    - Inserts all tunes into the MySQL database
+    - Parses the files in parallel worker processes to extract tune metadata,
+      skipping files that are unchanged since the last run
+    - Bulk loads all tunes into the MySQL database in one LOAD DATA statement,
+      or inserts the files concurrently over pooled connections if the
+      server doesn't allow local infile
     """
     print("=" * 60)
     print("ABC tunes dataset loader")
@@ -43,27 +124,55 @@ def load_all_tunes():
 
     # parse and load each file 
     print("\n[4/4] Parsing and loading tunes...")
-    total_tunes = 0
-    files_processed = 0
-
-    for book_number, file_path in abc_files:
-        try:
-            # parse the file 
-            tunes = parse_abc_file(file_path)
-
-            if tunes:
-
-                # inserting tunes into database
-                count = insert_tunes_batch(conn, tunes, book_number, file_path)
-                total_tunes += count
-                files_processed += 1
-
-                print(f"{file_path}: {count} tunes")
-            else:
-                print(f"{file_path}: No tunes found")
-
-        except Exception as e:
-            print(f" {file_path}: Error - {e}")
+    parsed_files = []
+
+    # parsing is CPU bound so spread the files across processes, the
+    # connection stays in this process
+    with ProcessPoolExecutor() as executor:
+        futures = {
+            executor.submit(parse_abc_file_cached, file_path): (book_number, file_path)
+            for book_number, file_path in abc_files
+        }
+
+        for future in as_completed(futures):
+            book_number, file_path = futures[future]
+            try:
+                # get the parsed tunes from the worker
+                tunes = future.result()
+
+                if tunes:
+                    parsed_files.append((book_number, file_path, tunes))
+                    print(f"{file_path}: {len(tunes)} tunes")
+                else:
+                    print(f"{file_path}: No tunes found")
+
+            except Exception as e:
+                print(f" {file_path}: Error - {e}")
+
+    # inserting tunes into database, all files in one bulk load
+    files_processed = len(parsed_files)
+    file_ids = [get_file_id(conn, book_number, file_path) for book_number, file_path, _ in parsed_files]
+
+    if None in file_ids:
+        total_tunes = None
+    else:
+        total_tunes = bulk_load_tunes(conn, (
+            tune_values(tune, file_id)
+            for file_id, (_, _, tunes) in zip(file_ids, parsed_files)
+            for tune in tunes
+        ))
+
+    if total_tunes is None:
+        conn.rollback()
+        print("Bulk load failed, inserting file by file instead...")
+
+        # inserts wait on the network, so threads each with their own connection overlap them
+        with ThreadPoolExecutor(max_workers=POOL_SIZE) as executor:
+            futures = [
+                executor.submit(insert_tunes_pooled, tunes, book_number, file_path)
+                for book_number, file_path, tunes in parsed_files
+            ]
+            total_tunes = sum(future.result() for future in futures)
     
     # close the datbase
     conn.close()
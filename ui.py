@@ -3,318 +3,591 @@ User interface for ABC Tune database
 """
 
 from analysis import (
+    DISPLAY_COLUMNS,
     load_tunes_from_database,
-    get_tunes_by_book,
-    get_tunes_by_type,
+    apply_tune_update,
+    remove_tune,
+    build_group_index,
+    get_tunes_by_book_indexed,
+    get_tunes_by_type_indexed,
+    get_tunes_by_key_indexed,
     search_tunes,
-    get_tunes_by_key,
     count_tunes_per_book,
     get_most_common_types,
     get_most_common_keys,
     get_summary_statistics
 )
+from database import (
+    DB_CONFIG,
+    connect_to_database,
+    ensure_connected,
+    get_tune_by_id,
+    get_tunes_fingerprint,
+    update_tune,
+    delete_tune
+)
 
-from tabulate import tabulate
+import glob
+import hashlib
+import os
+import pickle
+import sys
+import threading
+from collections import OrderedDict
 import pandas as pd
-from database import connect_to_database
+from typing import Optional
+from cache_utils import write_pickle_atomic
+
+# Columns with a lookup index, built from the session's DataFrame on first use
+INDEXED_COLUMNS = ('book_number', 'type', 'key_signature')
+_indexes = {}
+
+# Aggregates over the session's DataFrame, the top-N caches are keyed on N
+_book_counts_cache = None
+_type_counts_cache = {}
+_key_counts_cache = {}
+
+# Top-N sizes filled in at startup, the menu previews and the default for options 7/8
+WARM_TOP_N = (5, 10)
+
+# Clear while the startup thread is filling the caches above, set otherwise
+_caches_ready = threading.Event()
+_caches_ready.set()
+
+# Recently fetched tune records for edit/delete, tune_id -> get_tune_by_id result,
+# least recently used first
+TUNE_CACHE_SIZE = 128
+_tune_cache = OrderedDict()
+
+# The loaded DataFrame and its indexes are pickled here between sessions, keyed
+# on get_tunes_fingerprint so any change to the tunes makes a new entry
+SESSION_CACHE_DIR = '.tune_cache'
+
+# Listings printed ahead of a prompt ('books', 'types', 'keys'), shown once per session
+_previews_shown = set()
+
+
+def session_cache_path(fingerprint: tuple) -> str:
+    """Where the session cache for this database state lives"""
+    # pickled DataFrames don't always load in another pandas version
+    key = repr((DB_CONFIG['host'], DB_CONFIG['database'], DISPLAY_COLUMNS, pd.__version__, fingerprint))
+    key_hash = hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+    return os.path.join(SESSION_CACHE_DIR, f"session_{key_hash}.pkl")
+
+
+def load_session_cache(cache_path: str) -> Optional[pd.DataFrame]:
+    """
+    Load the DataFrame and indexes an earlier session saved to cache_path
+
+    Returns:
+        The cached DataFrame, with its indexes put back in _indexes, or None if there isn't one
+    """
+    try:
+        with open(cache_path, 'rb') as f:
+            cached = pickle.load(f)
+        df, indexes = cached['df'], cached['indexes']
+    except FileNotFoundError:
+        return None  # not cached yet, load from the database
+    except Exception as e:
+        # unreadable or from an incompatible version, a fresh load replaces it
+        print(f" Ignoring unreadable session cache: {e}")
+        return None
+
+    _indexes.update(indexes)
+    return df
+
+
+def save_session_cache(cache_path: str, df: pd.DataFrame):
+    """Pickle the DataFrame and its indexes to cache_path, replacing older entries"""
+    try:
+        os.makedirs(SESSION_CACHE_DIR, exist_ok=True)
+        clear_session_cache()
+
+        write_pickle_atomic(cache_path, {'df': df, 'indexes': dict(_indexes)})
+    except OSError as e:
+        print(f"Could not cache the session data: {e}")
+
+
+def clear_session_cache():
+    """Remove any saved session cache, e.g. after editing the tunes"""
+    for cache_path in glob.glob(os.path.join(SESSION_CACHE_DIR, "session_*.pkl")):
+        try:
+            os.remove(cache_path)
+        except OSError:
+            pass  # already gone
+
+
+def _warm_caches(df: pd.DataFrame, cache_path: Optional[str]):
+    """Build the indexes and the book/type/key counts, run in the background at startup"""
+    global _book_counts_cache
+    try:
+        for column in INDEXED_COLUMNS:
+            if column not in _indexes: # may already have come from the session cache
+                _indexes[column] = build_group_index(df, column)
+        _book_counts_cache = count_tunes_per_book(df)
+        for n in WARM_TOP_N:
+            _type_counts_cache[n] = get_most_common_types(df, n)
+            _key_counts_cache[n] = get_most_common_keys(df, n)
+
+        if cache_path:
+            save_session_cache(cache_path, df)
+    finally:
+        _caches_ready.set() # anything that failed just gets computed on first use
+
+
+def start_cache_warmup(df: pd.DataFrame, cache_path: Optional[str] = None):
+    """
+    Fill the caches in a daemon thread while the user reads the menu
+
+    The cache getters below wait for it to finish, so the first filter
+    or count the user asks for finds everything already computed.
+
+    Args:
+        df: The session's DataFrame
+        cache_path: Save df and its indexes here for the next session once they're built
+    """
+    _caches_ready.clear()
+    threading.Thread(target=_warm_caches, args=(df, cache_path), daemon=True).start()
+
+
+def get_index(df: pd.DataFrame, column: str):
+    """Return the lookup index for a column, building it the first time"""
+    _caches_ready.wait()
+    if column not in _indexes:
+        _indexes[column] = build_group_index(df, column)
+    return _indexes[column]
+
+
+def get_book_counts_cached(df: pd.DataFrame) -> pd.Series:
+    """count_tunes_per_book, computed once per session"""
+    global _book_counts_cache
+    _caches_ready.wait()
+    if _book_counts_cache is None:
+        _book_counts_cache = count_tunes_per_book(df)
+    return _book_counts_cache
+
+
+def get_common_types_cached(df: pd.DataFrame, n: int) -> pd.Series:
+    """get_most_common_types, computed once per session for each n"""
+    _caches_ready.wait()
+    if n not in _type_counts_cache:
+        _type_counts_cache[n] = get_most_common_types(df, n)
+    return _type_counts_cache[n]
+
+
+def get_common_keys_cached(df: pd.DataFrame, n: int) -> pd.Series:
+    """get_most_common_keys, computed once per session for each n"""
+    _caches_ready.wait()
+    if n not in _key_counts_cache:
+        _key_counts_cache[n] = get_most_common_keys(df, n)
+    return _key_counts_cache[n]
+
+
+def invalidate_caches():
+    """Forget the cached aggregates and indexes once an edit or delete has changed the session's frame"""
+    global _book_counts_cache
+    _caches_ready.wait()
+    _book_counts_cache = None
+    _type_counts_cache.clear()
+    _key_counts_cache.clear()
+    _indexes.clear()
+    _previews_shown.clear() # the frame was just changed, so show the recounted listings again
+    clear_session_cache()
+
+
+def get_tune_cached(conn, tune_id: int) -> Optional[dict]:
+    """get_tune_by_id, remembering the last TUNE_CACHE_SIZE tunes found"""
+    if tune_id in _tune_cache:
+        _tune_cache.move_to_end(tune_id)
+        return _tune_cache[tune_id]
+
+    tune = get_tune_by_id(conn, tune_id)
+    if tune: # not found isn't cached, the id may turn up later
+        _tune_cache[tune_id] = tune
+        if len(_tune_cache) > TUNE_CACHE_SIZE:
+            _tune_cache.popitem(last=False)
+    return tune
+
+
+def first_showing(preview: str) -> bool:
+    """True the first time a preview listing is asked for this session"""
+    if preview in _previews_shown:
+        return False
+    _previews_shown.add(preview)
+    return True
+
+
+# Separator lines, and every banner built from them once at import
+_EQ = "=" * 60
+_DASH = "-" * 60
+
+
+def _handler_header(title: str) -> str:
+    """Banner printed at the top of a menu handler"""
+    return f"\n{_DASH}\n{title}\n{_DASH}"
+
+
+_VIEW_BOOK_HEADER = _handler_header("VIEW TUNES BY BOOK")
+_SEARCH_TYPE_HEADER = _handler_header("SEARCH BY TUNE TYPE")
+_SEARCH_TITLE_HEADER = _handler_header("SEARCH BY TITLE")
+_SEARCH_KEY_HEADER = _handler_header("SEARCH BY KEY SIGNATURE")
+_STATISTICS_HEADER = _handler_header("SUMMARY STATISTICS")
+_TUNES_PER_BOOK_HEADER = _handler_header("TUNES PER BOOK")
+_COMMON_TYPES_HEADER = _handler_header("MOST COMMON TUNE TYPES")
+_COMMON_KEYS_HEADER = _handler_header("MOST COMMON KEY SIGNATURES")
+_EDIT_HEADER = _handler_header("EDIT TUNE")
+_DELETE_HEADER = _handler_header("DELETE TUNE")
+_EXPORT_HEADER = _handler_header("EXPORT TO PDF")
+
+_WELCOME_BANNER = f"\n{_EQ}\n WELCOME TO ABC TUNE DATABASE\n{_EQ}"
+_GOODBYE_BANNER = f"\n Thanks for using ABC Tune Database!\n{_EQ}"
+
+# The whole main menu as one string, so it goes out in a single print
+_MENU_TEXT = "\n".join([
+    f"\n{_EQ}",
+    "ABC TUNE DATABASE - MAIN MENU",
+    _EQ,
+    "1. View all tunes from a specific book",
+    "2. Search tunes by type",
+    "3. Search tunes by title",
+    "4. Search tunes by key signature",
+    "5. View statistics",
+    "6. View tunes per book",
+    "7. View most common tune types",
+    "8. View most common keys",
+    "9. Edit a tune",
+    "10. Delete a tune",
+    "11. Export to PDF",
+    "12. Exit",
+    _EQ
+])
 
 
 def display_menu():
     """Display the main menu options."""
-    print("\n" + "=" * 60)
-    print("ABC TUNE DATABASE - MAIN MENU")
-    print("=" * 60)
-    print("1. View all tunes from a specific book")
-    print("2. Search tunes by type")
-    print("3. Search tunes by title")
-    print("4. Search tunes by key signature")
-    print("5. View statistics")
-    print("6. View tunes per book")
-    print("7. View most common tune types")
-    print("8. View most common keys")
-    print("9. Edit a tune")
-    print("10. Delete a tune")
-    print("11. Export to PDF")
-    print("12. Exit")
-    print("=" * 60)
-
-def display_dataframe(df: pd.DataFrame, max_rows: int = 10):
+    print(_MENU_TEXT)
+
+def ask(prompt: str) -> str:
     """
-    Displaying the dataframe in a table format
+    Prompt for a line of input and return it stripped
+
+    Writes the prompt and reads stdin directly instead of going through
+    input(), which sets up readline line editing that the menus don't use.
+
+    Raises:
+        EOFError: at end of input, same as input()
+    """
+    sys.stdout.write(prompt)
+    sys.stdout.flush()
+    line = sys.stdin.readline()
+    if not line:
+        raise EOFError
+    return line.strip()
+
+
+def read_int(prompt: str, default: Optional[int] = None) -> Optional[int]:
+    """
+    Ask for a whole number, checking the text instead of catching int() errors
+
+    Args:
+        prompt: Text shown to the user
+        default: Value returned when the user just presses Enter
+
+    Returns:
+        The number entered, default for empty input, or None if it isn't a number
+    """
+    text = ask(prompt)
+    if not text:
+        return default
+
+    digits = text[1:] if text[0] in '+-' else text
+    if not digits.isdecimal():
+        return None
+    return int(text)
+
+
+def display_dataframe_paginated(df: pd.DataFrame, page_size: int = 10):
+    """
+    Displaying the dataframe in a table format, a page at a time
+
+    When there's more than one page the user can step through them with
+    n/p, each page is just an iloc slice of the already filtered frame.
 
     args:
         df: DataFrame to display
-        max_rows: Maximum nmber of rows to show
+        page_size: Maximum nmber of rows to show per page
     """
     if df.empty:
         print("\n No results found")
         return
     
-    # Select columns to display
-    display_columns = ['id', 'book_number', 'title', 'type', 'key_signature', 'meter']
-    df_display = df[display_columns]
+    n = len(df)
 
-    if len(df) > max_rows:
-        print(f"\n Showing first {max_rows} of {len(df)} results:")
-        df_display = df_display.head(max_rows)
-    else:
-        print(f"\n Found {len(df)} results:")
-    
-    print(tabulate(df_display, headers='keys', tablefmt='grid', showindex=False))
-    
-    if len(df) > max_rows:
-        print(f"\n... and {len(df) - max_rows} more results")
+    # A single match is listed field by field, no need to lay out a table
+    if n == 1:
+        print("\n Found 1 result:\n" + "\n".join(f"  {column}: {df[column].iat[0]}" for column in DISPLAY_COLUMNS))
+        return
+
+    if n <= page_size:
+        print(f"\n Found {n} results:")
+        print(df[list(DISPLAY_COLUMNS)].to_string(index=False, max_colwidth=40))
+        return
+
+    offset = 0
+    while True:
+        # Take the rows first so only the page's rows go into the display frame
+        page = df.iloc[offset:offset + page_size]
+        print(f"\n Showing results {offset + 1}-{offset + len(page)} of {n}:")
+        print(page[list(DISPLAY_COLUMNS)].to_string(index=False, max_colwidth=40))
+
+        action = ask("\n[n]ext page, [p]revious page, [q]uit (default q): ").lower()
+        if action == 'n':
+            if offset + page_size < n:
+                offset += page_size
+            else:
+                print(" Already on the last page.")
+        elif action == 'p':
+            if offset > 0:
+                offset -= page_size
+            else:
+                print(" Already on the first page.")
+        else:
+            return
 
 
 def handle_view_by_book(df: pd.DataFrame):
     """Handle viewing tunes from a specific book."""
-    print("\n" + "-" * 60)
-    print("VIEW TUNES BY BOOK")
-    print("-" * 60)
+    print(_VIEW_BOOK_HEADER)
     
-    # Show available books
-    book_counts = count_tunes_per_book(df)
-    print("\nAvailable books:")
-    for book_num, count in book_counts.items():
-        print(f"  Book {book_num}: {count} tunes")
+    # Show available books, the first time only
+    if first_showing('books'):
+        book_counts = get_book_counts_cached(df)
+        print("\nAvailable books:")
+        sys.stdout.writelines([f"  Book {book_num}: {count} tunes\n" for book_num, count in book_counts.items()])
     
-    try:
-        book_number = int(input("\nEnter book number: "))
-        results = get_tunes_by_book(df, book_number)
-        display_dataframe(results)
-    except ValueError:
+    book_number = read_int("\nEnter book number: ")
+    if book_number is None:
         print(" Invalid input. Please enter a number.")
+        return
+
+    results = get_tunes_by_book_indexed(df, get_index(df, 'book_number'), book_number)
+    display_dataframe_paginated(results)
 
 
 def handle_search_by_type(df: pd.DataFrame):
     """Handle searching tunes by type."""
-    print("\n" + "-" * 60)
-    print("SEARCH BY TUNE TYPE")
-    print("-" * 60)
+    print(_SEARCH_TYPE_HEADER)
     
-    # Show common types
-    print("\nMost common types:")
-    top_types = get_most_common_types(df, 5)
-    for tune_type, count in top_types.items():
-        print(f"  {tune_type}: {count} tunes")
+    # Show common types, the first time only
+    if first_showing('types'):
+        print("\nMost common types:")
+        top_types = get_common_types_cached(df, 5)
+        sys.stdout.writelines([f"  {tune_type}: {count} tunes\n" for tune_type, count in top_types.items()])
     
-    tune_type = input("\nEnter tune type to search (e.g., reel, jig): ").strip()
+    tune_type = ask("\nEnter tune type to search (e.g., reel, jig): ")
     if tune_type:
-        results = get_tunes_by_type(df, tune_type)
-        display_dataframe(results)
+        results = get_tunes_by_type_indexed(df, get_index(df, 'type'), tune_type)
+        display_dataframe_paginated(results)
     else:
         print(" Please enter a tune type.")
 
 
 def handle_search_by_title(df: pd.DataFrame):
     """Handle searching tunes by title."""
-    print("\n" + "-" * 60)
-    print("SEARCH BY TITLE")
-    print("-" * 60)
+    print(_SEARCH_TITLE_HEADER)
     
-    search_term = input("\nEnter search term: ").strip()
+    search_term = ask("\nEnter search term: ")
     if search_term:
         results = search_tunes(df, search_term)
-        display_dataframe(results)
+        display_dataframe_paginated(results)
     else:
         print(" Please enter a search term.")
 
 
 def handle_search_by_key(df: pd.DataFrame):
     """Handle searching tunes by key signature."""
-    print("\n" + "-" * 60)
-    print("SEARCH BY KEY SIGNATURE")
-    print("-" * 60)
+    print(_SEARCH_KEY_HEADER)
     
-    # Show common keys
-    print("\nMost common keys:")
-    top_keys = get_most_common_keys(df, 5)
-    for key, count in top_keys.items():
-        print(f"  {key}: {count} tunes")
+    # Show common keys, the first time only
+    if first_showing('keys'):
+        print("\nMost common keys:")
+        top_keys = get_common_keys_cached(df, 5)
+        sys.stdout.writelines([f"  {key}: {count} tunes\n" for key, count in top_keys.items()])
     
-    key_signature = input("\nEnter key signature (e.g., D, G, Am): ").strip()
+    key_signature = ask("\nEnter key signature (e.g., D, G, Am): ")
     if key_signature:
-        results = get_tunes_by_key(df, key_signature)
-        display_dataframe(results)
+        results = get_tunes_by_key_indexed(df, get_index(df, 'key_signature'), key_signature)
+        display_dataframe_paginated(results)
     else:
         print("Please enter a key signature.")
 
 
 def handle_view_statistics(df: pd.DataFrame):
     """Handle displaying summary statistics."""
-    print("\n" + "-" * 60)
-    print("SUMMARY STATISTICS")
-    print("-" * 60)
+    print(_STATISTICS_HEADER)
     
     stats = get_summary_statistics(df)
     
-    print(f"\n Total Tunes: {stats['total_tunes']}")
-    print(f" Total Books: {stats['total_books']}")
-    print(f" Total Tune Types: {stats['total_types']}")
-    print(f" Total Key Signatures: {stats['total_keys']}")
-    print(f" Most Common Type: {stats['most_common_type']}")
-    print(f" Most Common Key: {stats['most_common_key']}")
+    print("\n".join([
+        f"\n Total Tunes: {stats['total_tunes']}",
+        f" Total Books: {stats['total_books']}",
+        f" Total Tune Types: {stats['total_types']}",
+        f" Total Key Signatures: {stats['total_keys']}",
+        f" Most Common Type: {stats['most_common_type']}",
+        f" Most Common Key: {stats['most_common_key']}"
+    ]))
 
 
 def handle_view_tunes_per_book(df: pd.DataFrame):
     """Handle displaying tune counts per book."""
-    print("\n" + "-" * 60)
-    print("TUNES PER BOOK")
-    print("-" * 60)
+    print(_TUNES_PER_BOOK_HEADER)
     
-    counts = count_tunes_per_book(df)
+    counts = get_book_counts_cached(df)
     print()
-    for book_num, count in counts.items():
-        print(f" Book {book_num}: {count} tunes")
+    # one write for the whole listing rather than a print per book
+    sys.stdout.writelines([f" Book {book_num}: {count} tunes\n" for book_num, count in counts.items()])
 
 
 def handle_view_common_types(df: pd.DataFrame):
     """Handle displaying most common tune types."""
-    print("\n" + "-" * 60)
-    print("MOST COMMON TUNE TYPES")
-    print("-" * 60)
+    print(_COMMON_TYPES_HEADER)
     
-    try:
-        n = int(input("\nHow many top types to display? (default 10): ") or "10")
-        top_types = get_most_common_types(df, n)
-        
-        print(f"\n Top {n} Tune Types:")
-        for i, (tune_type, count) in enumerate(top_types.items(), 1):
-            print(f"{i}. {tune_type}: {count} tunes")
-    except ValueError:
+    n = read_int("\nHow many top types to display? (default 10): ", default=10)
+    if n is None:
         print(" Invalid input. Please enter a number.")
+        return
+
+    top_types = get_common_types_cached(df, n)
+    
+    print(f"\n Top {n} Tune Types:")
+    sys.stdout.writelines([f"{i}. {tune_type}: {count} tunes\n" for i, (tune_type, count) in enumerate(top_types.items(), 1)])
 
 
 def handle_view_common_keys(df: pd.DataFrame):
     """Handle displaying most common key signatures."""
-    print("\n" + "-" * 60)
-    print("MOST COMMON KEY SIGNATURES")
-    print("-" * 60)
+    print(_COMMON_KEYS_HEADER)
     
-    try:
-        n = int(input("\nHow many top keys to display? (default 10): ") or "10")
-        top_keys = get_most_common_keys(df, n)
-        
-        print(f"\n Top {n} Key Signatures:")
-        for i, (key, count) in enumerate(top_keys.items(), 1):
-            print(f"{i}. {key}: {count} tunes")
-    except ValueError:
+    n = read_int("\nHow many top keys to display? (default 10): ", default=10)
+    if n is None:
         print(" Invalid input. Please enter a number.")
+        return
 
-def handle_edit_tune(df: pd.DataFrame):
-    """Handle editing a tune"""
-    print("\n" + "-" * 60)
-    print("EDIT TUNE")
-    print("-" * 60)
+    top_keys = get_common_keys_cached(df, n)
+    
+    print(f"\n Top {n} Key Signatures:")
+    sys.stdout.writelines([f"{i}. {key}: {count} tunes\n" for i, (key, count) in enumerate(top_keys.items(), 1)])
 
-    try:
-        tune_id = int(input("\nEnter tune ID to edit: "))
+def handle_edit_tune(df: pd.DataFrame, conn):
+    """Handle editing a tune using the session's database connection"""
+    print(_EDIT_HEADER)
 
-        # GEt current tune info
-        conn = connect_to_database()
-        if not conn:
-            return
-        
-        from database import get_tune_by_id
-        tune = get_tune_by_id(conn, tune_id)
+    if conn is None:
+        print("Not connected to the database, so tunes can't be edited right now.")
+        return
 
-        if not tune:
-            print(f"Tune with ID {tune_id} not found")
-            conn.close()
-            return
-        
-        # display current info
-        print(f"\nCurrent tune info:")
-        print(f"  Title: {tune['title']}")
-        print(f"  Type: {tune['type']}")
-        print(f"  Key: {tune['key_signature']}")
-        print(f"  Meter: {tune['meter']}")
-
-        # Get updates
-        print("\nEnter new values (press Enter to skip):")
-        updates = {}
-        
-        new_title = input(f"New title [{tune['title']}]: ").strip()
-        if new_title:
-            updates['title'] = new_title
-        
-        new_type = input(f"New type [{tune['type']}]: ").strip()
-        if new_type:
-            updates['type'] = new_type
-        
-        new_key = input(f"New key [{tune['key_signature']}]: ").strip()
-        if new_key:
-            updates['key_signature'] = new_key
-        
-        new_meter = input(f"New meter [{tune['meter']}]: ").strip()
-        if new_meter:
-            updates['meter'] = new_meter
-        
-        if updates:
-            from database import update_tune
-            if update_tune(conn, tune_id, updates):
-                print("Tune updated successfully!")
-            else:
-                print("Failed to update tune")
-        else:
-            print("No changes made")
-        
-        conn.close()
-        
-    except ValueError:
+    tune_id = read_int("\nEnter tune ID to edit: ")
+    if tune_id is None:
         print("Invalid input. Please enter a number.")
+        return
+
+    if not ensure_connected(conn):
+        return
+
+    # GEt current tune info
+    tune = get_tune_cached(conn, tune_id)
+
+    if not tune:
+        print(f"Tune with ID {tune_id} not found")
+        return
+
+    # display current info
+    print(f"\nCurrent tune info:")
+    print(f"  Title: {tune['title']}")
+    print(f"  Type: {tune['type']}")
+    print(f"  Key: {tune['key_signature']}")
+    print(f"  Meter: {tune['meter']}")
+
+    # Get updates
+    print("\nEnter new values (press Enter to skip):")
+    updates = {}
+
+    new_title = ask(f"New title [{tune['title']}]: ")
+    if new_title:
+        updates['title'] = new_title
+
+    new_type = ask(f"New type [{tune['type']}]: ")
+    if new_type:
+        updates['type'] = new_type
+
+    new_key = ask(f"New key [{tune['key_signature']}]: ")
+    if new_key:
+        updates['key_signature'] = new_key
+
+    new_meter = ask(f"New meter [{tune['meter']}]: ")
+    if new_meter:
+        updates['meter'] = new_meter
+
+    if updates:
+        if update_tune(conn, tune_id, updates):
+            _tune_cache.pop(tune_id, None)
+            # keep the session's frame in step, then recount it
+            apply_tune_update(df, tune_id, updates)
+            invalidate_caches()
+            print("Tune updated successfully!")
+        else:
+            print("Failed to update tune")
+    else:
+        print("No changes made")
 
-def handle_delete_tune(df: pd.DataFrame):
-    """Handle deleting a tune."""
-    print("\n" + "-" * 60)
-    print("DELETE TUNE")
-    print("-" * 60)
+def handle_delete_tune(df: pd.DataFrame, conn):
+    """Handle deleting a tune using the session's database connection."""
+    print(_DELETE_HEADER)
     print("WARNING: This action cannot be undone!")
+
+    if conn is None:
+        print("Not connected to the database, so tunes can't be deleted right now.")
+        return
     
-    try:
-        tune_id = int(input("\nEnter tune ID to delete: "))
-        
-        # Get tune info first
-        conn = connect_to_database()
-        if not conn:
-            return
-        
-        from database import get_tune_by_id, delete_tune
-        tune = get_tune_by_id(conn, tune_id)
-        
-        if not tune:
-            print(f"Tune with ID {tune_id} not found")
-            conn.close()
-            return
-        
-        # Confirm deletion
-        print(f"\nYou are about to delete:")
-        print(f"  ID: {tune['id']}")
-        print(f"  Title: {tune['title']}")
-        print(f"  Type: {tune['type']}")
-        
-        confirm = input("\nAre you sure? (yes/no): ").strip().lower()
-        
-        if confirm == 'yes':
-            if delete_tune(conn, tune_id):
-                print("Tune deleted successfully!")
-            else:
-                print("Failed to delete tune")
-        else:
-            print("Deletion cancelled")
-        
-        conn.close()
-        
-    except ValueError:
+    tune_id = read_int("\nEnter tune ID to delete: ")
+    if tune_id is None:
         print("Invalid input. Please enter a number.")
+        return
+
+    if not ensure_connected(conn):
+        return
+
+    # Get tune info first
+    tune = get_tune_cached(conn, tune_id)
+
+    if not tune:
+        print(f"Tune with ID {tune_id} not found")
+        return
+
+    # Confirm deletion
+    print(f"\nYou are about to delete:")
+    print(f"  ID: {tune['id']}")
+    print(f"  Title: {tune['title']}")
+    print(f"  Type: {tune['type']}")
+
+    confirm = ask("\nAre you sure? (yes/no): ").lower()
+
+    if confirm == 'yes':
+        if delete_tune(conn, tune_id):
+            _tune_cache.pop(tune_id, None)
+            # keep the session's frame in step, then recount it
+            remove_tune(df, tune_id)
+            invalidate_caches()
+            print("Tune deleted successfully!")
+        else:
+            print("Failed to delete tune")
+    else:
+        print("Deletion cancelled")
 
 def handle_export_pdf(df: pd.DataFrame):
     """Handle exporting to PDF."""
-    print("\n" + "-" * 60)
-    print("EXPORT TO PDF")
-    print("-" * 60)
+    print(_EXPORT_HEADER)
     
-    filename = input("\nEnter filename (default: tunes_export.pdf): ").strip()
+    filename = ask("\nEnter filename (default: tunes_export.pdf): ")
     if not filename:
         filename = "tunes_export.pdf"
     
@@ -324,63 +597,87 @@ def handle_export_pdf(df: pd.DataFrame):
     from analysis import export_to_pdf
     
     print(f"\nExporting {len(df)} tunes to {filename}...")
-    if export_to_pdf(df, filename):
+    # every tune, export_to_pdf lays them out a table chunk at a time
+    if export_to_pdf(df, filename, max_rows=None):
         print(f"Export complete! File saved: {filename}")
     else:
         print("Export failed")
 
+# Menu choice -> handler, the handlers in DB_HANDLERS also get the session connection
+HANDLERS = {
+    '1': handle_view_by_book,
+    '2': handle_search_by_type,
+    '3': handle_search_by_title,
+    '4': handle_search_by_key,
+    '5': handle_view_statistics,
+    '6': handle_view_tunes_per_book,
+    '7': handle_view_common_types,
+    '8': handle_view_common_keys,
+    '11': handle_export_pdf
+}
+
+DB_HANDLERS = {
+    '9': handle_edit_tune,
+    '10': handle_delete_tune
+}
+
 def main_loop():
     """Main application loop."""
-    print("\n" + "=" * 60)
-    print(" WELCOME TO ABC TUNE DATABASE")
-    print("=" * 60)
+    print(_WELCOME_BANNER)
     
-    # Load data once at startup
+    # One connection for the whole session, used to check the session cache and
+    # shared by the edit and delete handlers
+    conn = connect_to_database()
+
+    # Load data once at startup, from the session cache if the tunes haven't changed
     print("\n Loading data from database...")
-    df = load_tunes_from_database()
+    fingerprint = get_tunes_fingerprint(conn) if conn is not None else None
+    cache_path = session_cache_path(fingerprint) if fingerprint else None
+
+    df = load_session_cache(cache_path) if cache_path else None
+    if df is not None:
+        cache_path = None # already cached, nothing to save
+    else:
+        # only the columns the menu shows, the notation text is never needed here
+        df = load_tunes_from_database(DISPLAY_COLUMNS)
     
     if df is None:
         print(" Failed to load data. Exiting.")
+        if conn is not None:
+            conn.close()
         return
     
     print(f" Loaded {len(df)} tunes successfully!")
+
+    # df isn't reloaded during the session, so index and count it once for the
+    # filters, in the background while the menu is up, and save it for next time
+    start_cache_warmup(df, cache_path)
     
-    # Main menu loop
-    while True:
-        display_menu()
-        choice = input("\nEnter your choice (1-12): ").strip()
+    # Main menu loop, closing the connection however the session ends
+    try:
+        while True:
+            display_menu()
+            choice = ask("\nEnter your choice (1-12): ")
         
-        if choice == '1':
-            handle_view_by_book(df)
-        elif choice == '2':
-            handle_search_by_type(df)
-        elif choice == '3':
-            handle_search_by_title(df)
-        elif choice == '4':
-            handle_search_by_key(df)
-        elif choice == '5':
-            handle_view_statistics(df)
-        elif choice == '6':
-            handle_view_tunes_per_book(df)
-        elif choice == '7':
-            handle_view_common_types(df)
-        elif choice == '8':
-            handle_view_common_keys(df)
-        elif choice == '9':
-            handle_edit_tune(df)
-        elif choice == '10':
-            handle_delete_tune(df)
-        elif choice == '11':
-            handle_export_pdf(df)
-        elif choice == '12':
-            print("\n Thanks for using ABC Tune Database!")
-            print("=" * 60)
-            break
-        else:
-            print("\n Invalid choice. Please enter a number between 1 and 12.")
+            handler = HANDLERS.get(choice)
+            db_handler = DB_HANDLERS.get(choice)
+
+            if handler:
+                handler(df)
+            elif db_handler:
+                db_handler(df, conn)
+            elif choice == '12':
+                print(_GOODBYE_BANNER)
+                break
+            else:
+                print("\n Invalid choice. Please enter a number between 1 and 12.")
         
-        # Pause before showing menu again
-        input("\nPress Enter to continue...")
+            # Pause before showing menu again
+            ask("\nPress Enter to continue...")
+    finally:
+        _caches_ready.wait() # let the warmup thread finish writing the session cache
+        if conn is not None:
+            conn.close()
 
 
 # Run the application